@@ -2,7 +2,8 @@
 from datetime import datetime
 import json
 import os
-from typing import Dict, List, Optional, Union
+import tempfile
+from typing import Dict, Iterator, List, Optional, Union
 
 # This is a simple file-based database for the demo
 # In a real app, you would use a proper database like SQLite, PostgreSQL, etc.
@@ -11,12 +12,14 @@ DATA_DIR = "data"
 USER_FILE = os.path.join(DATA_DIR, "users.json")
 ITEMS_FILE = os.path.join(DATA_DIR, "items.json")
 OUTFITS_FILE = os.path.join(DATA_DIR, "outfits.json")
+STATS_FILE = os.path.join(DATA_DIR, "stats.json")
+WEAR_EVENTS_FILE = os.path.join(DATA_DIR, "wear_events.jsonl")
 
 # Ensure data directory exists
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # Initialize empty data files if they don't exist
-for file_path in [USER_FILE, ITEMS_FILE, OUTFITS_FILE]:
+for file_path in [USER_FILE, ITEMS_FILE, OUTFITS_FILE, STATS_FILE]:
     if not os.path.exists(file_path):
         with open(file_path, "w") as f:
             json.dump({}, f)
@@ -29,8 +32,16 @@ def load_data(file_path: str) -> Dict:
         return {}
 
 def save_data(file_path: str, data: Dict) -> None:
-    with open(file_path, "w") as f:
-        json.dump(data, f, default=str)
+    # Write to a temporary file and swap it in, so a reader never sees a
+    # truncated or half-written file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 # User functions
 def get_user_by_email(email: str) -> Optional[Dict]:
@@ -58,6 +69,11 @@ def get_items_by_user(user_id: str) -> List[Dict]:
     user_items = items_data.get(user_id, {})
     return [{"id": item_id, **item} for item_id, item in user_items.items()]
 
+def iter_items_by_user(user_id: str) -> Iterator[Dict]:
+    items_data = load_data(ITEMS_FILE)
+    for item_id, item in items_data.get(user_id, {}).items():
+        yield {"id": item_id, **item}
+
 def get_item_by_id(user_id: str, item_id: str) -> Optional[Dict]:
     items_data = load_data(ITEMS_FILE)
     user_items = items_data.get(user_id, {})
@@ -73,6 +89,14 @@ def create_item(user_id: str, item_id: str, item_data: Dict) -> Dict:
     save_data(ITEMS_FILE, items_data)
     return {"id": item_id, **item_data}
 
+def create_items(user_id: str, new_items: Dict[str, Dict]) -> None:
+    """Write a batch of items with a single load/save of the items file."""
+    items_data = load_data(ITEMS_FILE)
+    user_items = items_data.get(user_id, {})
+    user_items.update(new_items)
+    items_data[user_id] = user_items
+    save_data(ITEMS_FILE, items_data)
+
 def update_item(user_id: str, item_id: str, item_updates: Dict) -> Optional[Dict]:
     items_data = load_data(ITEMS_FILE)
     user_items = items_data.get(user_id, {})
@@ -110,6 +134,12 @@ def delete_item(user_id: str, item_id: str) -> bool:
     outfits_data[user_id] = user_outfits
     save_data(OUTFITS_FILE, outfits_data)
     
+    # Drop the item's wear counter; category/season rollups keep its history
+    stats_data = load_data(STATS_FILE)
+    if user_id in stats_data:
+        stats_data[user_id]["items"].pop(item_id, None)
+        save_data(STATS_FILE, stats_data)
+    
     return True
 
 # Outfit functions
@@ -118,6 +148,11 @@ def get_outfits_by_user(user_id: str) -> List[Dict]:
     user_outfits = outfits_data.get(user_id, {})
     return [{"id": outfit_id, **outfit} for outfit_id, outfit in user_outfits.items()]
 
+def iter_outfits_by_user(user_id: str) -> Iterator[Dict]:
+    outfits_data = load_data(OUTFITS_FILE)
+    for outfit_id, outfit in outfits_data.get(user_id, {}).items():
+        yield {"id": outfit_id, **outfit}
+
 def get_outfit_by_id(user_id: str, outfit_id: str) -> Optional[Dict]:
     outfits_data = load_data(OUTFITS_FILE)
     user_outfits = outfits_data.get(user_id, {})
@@ -133,6 +168,14 @@ def create_outfit(user_id: str, outfit_id: str, outfit_data: Dict) -> Dict:
     save_data(OUTFITS_FILE, outfits_data)
     return {"id": outfit_id, **outfit_data}
 
+def create_outfits(user_id: str, new_outfits: Dict[str, Dict]) -> None:
+    """Write a batch of outfits with a single load/save of the outfits file."""
+    outfits_data = load_data(OUTFITS_FILE)
+    user_outfits = outfits_data.get(user_id, {})
+    user_outfits.update(new_outfits)
+    outfits_data[user_id] = user_outfits
+    save_data(OUTFITS_FILE, outfits_data)
+
 def update_outfit(user_id: str, outfit_id: str, outfit_updates: Dict) -> Optional[Dict]:
     outfits_data = load_data(OUTFITS_FILE)
     user_outfits = outfits_data.get(user_id, {})
@@ -158,4 +201,117 @@ def delete_outfit(user_id: str, outfit_id: str) -> bool:
     del user_outfits[outfit_id]
     outfits_data[user_id] = user_outfits
     save_data(OUTFITS_FILE, outfits_data)
+    
+    stats_data = load_data(STATS_FILE)
+    if user_id in stats_data:
+        stats_data[user_id]["outfits"].pop(outfit_id, None)
+        save_data(STATS_FILE, stats_data)
+    
     return True
+
+# Wear history functions
+# Every wear is appended to WEAR_EVENTS_FILE and folded into the per-user
+# aggregates in STATS_FILE, so reading stats never replays the history.
+def _empty_stats() -> Dict:
+    return {
+        "totalWears": 0,
+        "items": {},
+        "outfits": {},
+        "categories": {},
+        "seasons": {},
+        "byMonth": {},
+        "byWeekday": {},
+    }
+
+def normalize_timestamp(value: Union[datetime, str]) -> datetime:
+    """
+    Return a naive local datetime, the form the rest of the store uses
+    (createdAt comes from datetime.now()). Aware values are converted first.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+def _later(current: Optional[str], worn_at: datetime) -> bool:
+    return current is None or worn_at > normalize_timestamp(current)
+
+def _bump_counter(counter: Dict, worn_at: datetime) -> None:
+    counter["count"] = counter.get("count", 0) + 1
+    first_worn = counter.get("firstWorn")
+    if first_worn is None or worn_at < normalize_timestamp(first_worn):
+        counter["firstWorn"] = str(worn_at)
+    if _later(counter.get("lastWorn"), worn_at):
+        counter["lastWorn"] = str(worn_at)
+
+def _append_wear_event(event: Dict) -> None:
+    with open(WEAR_EVENTS_FILE, "a") as f:
+        f.write(json.dumps(event, default=str) + "\n")
+
+def _touch_last_worn(record: Dict, worn_at: datetime) -> None:
+    if _later(record.get("lastWorn"), worn_at):
+        record["lastWorn"] = str(worn_at)
+
+def record_wear(
+    user_id: str,
+    worn_at: datetime,
+    item_ids: List[str],
+    outfit_id: Optional[str] = None,
+) -> Dict:
+    """Append a wear event and update the user's aggregates in place."""
+    worn_at = normalize_timestamp(worn_at)
+    # An outfit may list the same item twice; it is still one wear
+    item_ids = list(dict.fromkeys(item_ids))
+    
+    items_data = load_data(ITEMS_FILE)
+    user_items = items_data.get(user_id, {})
+    stats_data = load_data(STATS_FILE)
+    stats = stats_data.setdefault(user_id, _empty_stats())
+    
+    event = {
+        "userId": user_id,
+        "outfitId": outfit_id,
+        "items": item_ids,
+        "wornAt": worn_at,
+    }
+    _append_wear_event(event)
+    
+    month = worn_at.strftime("%Y-%m")
+    weekday = str(worn_at.weekday())
+    
+    for item_id in item_ids:
+        item = user_items.get(item_id)
+        if item is None:
+            continue
+        _touch_last_worn(item, worn_at)
+        _bump_counter(stats["items"].setdefault(item_id, {}), worn_at)
+        
+        category = item.get("category")
+        if category:
+            stats["categories"][category] = stats["categories"].get(category, 0) + 1
+        for season in item.get("season", []):
+            stats["seasons"][season] = stats["seasons"].get(season, 0) + 1
+        
+        stats["totalWears"] += 1
+        stats["byMonth"][month] = stats["byMonth"].get(month, 0) + 1
+        stats["byWeekday"][weekday] = stats["byWeekday"].get(weekday, 0) + 1
+    
+    items_data[user_id] = user_items
+    save_data(ITEMS_FILE, items_data)
+    
+    if outfit_id is not None:
+        outfits_data = load_data(OUTFITS_FILE)
+        user_outfits = outfits_data.get(user_id, {})
+        if outfit_id in user_outfits:
+            _touch_last_worn(user_outfits[outfit_id], worn_at)
+            outfits_data[user_id] = user_outfits
+            save_data(OUTFITS_FILE, outfits_data)
+        _bump_counter(stats["outfits"].setdefault(outfit_id, {}), worn_at)
+    
+    save_data(STATS_FILE, stats_data)
+    return event
+
+def get_stats_by_user(user_id: str) -> Dict:
+    stats_data = load_data(STATS_FILE)
+    return stats_data.get(user_id, _empty_stats())
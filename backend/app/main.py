@@ -2,7 +2,7 @@
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import auth, items, outfits, images
+from .routers import auth, items, outfits, images, stats, transfer
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +29,8 @@ app.include_router(auth.router)
 app.include_router(items.router)
 app.include_router(outfits.router)
 app.include_router(images.router)
+app.include_router(stats.router)
+app.include_router(transfer.router)
 
 @app.get("/")
 async def root():
@@ -1,7 +1,7 @@
 
-from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, validator
 
 # Auth models
 class UserBase(BaseModel):
@@ -115,3 +115,52 @@ class OutfitUpdate(BaseModel):
     season: Optional[List[str]] = None
     favorite: Optional[bool] = None
     lastWorn: Optional[datetime] = None
+
+# Wear history models
+# Allowance for client clocks running slightly ahead of the server
+WEAR_CLOCK_SKEW = timedelta(minutes=5)
+
+class WearEventCreate(BaseModel):
+    wornAt: Optional[datetime] = None
+    
+    @validator("wornAt")
+    def not_in_future(cls, value):
+        if value is None:
+            return value
+        now = datetime.now(timezone.utc) if value.tzinfo else datetime.now()
+        if value > now + WEAR_CLOCK_SKEW:
+            raise ValueError("wornAt cannot be in the future")
+        return value
+
+class WearEvent(BaseModel):
+    outfitId: Optional[str] = None
+    items: List[str]
+    wornAt: datetime
+
+class WearCount(BaseModel):
+    id: str
+    count: int
+    lastWorn: Optional[datetime] = None
+
+class ClosetStats(BaseModel):
+    totalWears: int
+    mostWorn: List[WearCount]
+    leastWorn: List[WearCount]
+    unworn: List[str]
+    categories: Dict[str, int]
+    seasons: Dict[str, int]
+    byMonth: Dict[str, int]
+    byWeekday: Dict[str, int]
+
+# Export/import models
+class ImportLineError(BaseModel):
+    line: int
+    detail: str
+
+class ImportSummary(BaseModel):
+    linesRead: int
+    itemsImported: int
+    outfitsImported: int
+    batches: int
+    errors: List[ImportLineError]
+    errorCount: int
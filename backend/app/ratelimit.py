@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+
+from .auth import ALGORITHM, SECRET_KEY
+
+# Token bucket settings, shared by every limited route.
+# A route's cost is how many tokens one call takes out of the bucket.
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" or "sqlite"
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", os.path.join("data", "ratelimit.db"))
+RATE_LIMIT_CAPACITY = float(os.getenv("RATE_LIMIT_CAPACITY", "60"))
+RATE_LIMIT_REFILL_PER_SECOND = float(os.getenv("RATE_LIMIT_REFILL_PER_SECOND", "1"))
+IMAGE_MAX_CONCURRENCY = int(os.getenv("IMAGE_MAX_CONCURRENCY", "2"))
+# Buckets that have refilled to capacity behave exactly like missing ones,
+# so they are swept out at most this often to keep storage bounded.
+SWEEP_INTERVAL_SECONDS = 60
+
+logger = logging.getLogger("wardrobe-api")
+
+
+def _validate_settings() -> None:
+    if RATE_LIMIT_REFILL_PER_SECOND <= 0:
+        raise ValueError("RATE_LIMIT_REFILL_PER_SECOND must be greater than 0")
+    if RATE_LIMIT_CAPACITY <= 0:
+        raise ValueError("RATE_LIMIT_CAPACITY must be greater than 0")
+    if IMAGE_MAX_CONCURRENCY < 1:
+        raise ValueError("IMAGE_MAX_CONCURRENCY must be at least 1")
+
+
+_validate_settings()
+
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token", auto_error=False)
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: float, rate: float) -> float:
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+def _charge(
+    buckets: Dict[str, Tuple[float, float]], cost: float, now: float, capacity: float, rate: float
+) -> Tuple[float, Dict[str, Tuple[float, float]]]:
+    """
+    Charge every bucket or none of them. `buckets` maps key to its stored
+    (tokens, updated). Returns seconds to wait (0 on success) and the new
+    (tokens, full_at) for each key.
+    """
+    levels = {key: _refill(tokens, updated, now, capacity, rate) for key, (tokens, updated) in buckets.items()}
+    retry_after = max((cost - tokens) / rate for tokens in levels.values()) if levels else 0.0
+    if retry_after <= 0:
+        retry_after = 0.0
+        levels = {key: tokens - cost for key, tokens in levels.items()}
+    return retry_after, {
+        key: (tokens, now + (capacity - tokens) / rate) for key, tokens in levels.items()
+    }
+
+
+class MemoryBackend:
+    """Buckets kept in this process only. Each worker limits on its own."""
+
+    def __init__(self):
+        # key -> (tokens, updated, full_at)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def take(self, keys: List[str], cost: float, capacity: float, rate: float) -> float:
+        """
+        Take `cost` tokens from each bucket in `keys`, only if all of them can
+        afford it. Returns 0 on success, else seconds to wait.
+        """
+        now = time.monotonic()
+        with self._lock:
+            stored = {key: self._buckets.get(key, (capacity, now, now))[:2] for key in keys}
+            retry_after, updated = _charge(stored, cost, now, capacity, rate)
+            for key, (tokens, full_at) in updated.items():
+                self._buckets[key] = (tokens, now, full_at)
+            if now - self._last_sweep >= SWEEP_INTERVAL_SECONDS:
+                self._sweep(now)
+        return retry_after
+
+    def _sweep(self, now: float) -> None:
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        self._last_sweep = now
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SqliteBackend:
+    """Buckets kept in a local SQLite file, shared by all workers on the host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._last_sweep = time.time()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, "
+                "tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS buckets_full_at ON buckets (full_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def take(self, keys: List[str], cost: float, capacity: float, rate: float) -> float:
+        # Wall clock rather than monotonic: timestamps are compared across processes
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            stored = {}
+            for key in keys:
+                row = conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                stored[key] = row if row else (capacity, now)
+            retry_after, updated = _charge(stored, cost, now, capacity, rate)
+            conn.executemany(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                [(key, tokens, now, full_at) for key, (tokens, full_at) in updated.items()],
+            )
+            if now - self._last_sweep >= SWEEP_INTERVAL_SECONDS:
+                conn.execute("DELETE FROM buckets WHERE full_at <= ?", (now,))
+                self._last_sweep = now
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return retry_after
+
+    def __len__(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+        finally:
+            conn.close()
+
+
+def _create_backend():
+    if RATE_LIMIT_BACKEND == "sqlite":
+        return SqliteBackend(RATE_LIMIT_SQLITE_PATH)
+    return MemoryBackend()
+
+
+backend = _create_backend()
+
+
+def _too_many_requests(retry_after: float, detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def _user_id_from_token(token: Optional[str]) -> Optional[str]:
+    # Only used as a bucket key, so skip the database lookup get_current_user does
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+def rate_limit(cost: float = 1, scope: str = "default"):
+    """
+    Dependency that charges `cost` tokens to the caller's IP bucket and,
+    when the request carries a valid token, to their user bucket as well.
+    Routes with different scopes draw from separate buckets.
+    """
+    # Routes call this at import time, so a misconfigured capacity fails at startup
+    if cost > RATE_LIMIT_CAPACITY:
+        raise ValueError(
+            f"RATE_LIMIT_CAPACITY ({RATE_LIMIT_CAPACITY:g}) is below the cost of "
+            f"the {scope!r} rate limit ({cost:g}); those requests could never succeed"
+        )
+
+    # A plain def so FastAPI runs it in the threadpool; the SQLite backend
+    # may wait on a lock held by another worker.
+    def dependency(request: Request, token: Optional[str] = Depends(optional_oauth2_scheme)):
+        keys = []
+        if request.client is not None:
+            keys.append(f"{scope}:ip:{request.client.host}")
+        user_id = _user_id_from_token(token)
+        if user_id is not None:
+            keys.append(f"{scope}:user:{user_id}")
+
+        try:
+            retry_after = backend.take(keys, cost, RATE_LIMIT_CAPACITY, RATE_LIMIT_REFILL_PER_SECOND)
+        except sqlite3.OperationalError as e:
+            # Fail open: a busy limiter should not take the endpoint down with it
+            logger.warning(f"Rate limiter unavailable, allowing request: {str(e)}")
+            return
+        if retry_after:
+            raise _too_many_requests(retry_after, "Rate limit exceeded")
+
+    return dependency
+
+
+class ConcurrencyLimit:
+    """
+    Caps how many requests of one kind run at once in this process.
+    Requests over the cap are rejected immediately instead of queueing.
+    """
+
+    def __init__(self, limit: int, retry_after: float = 1):
+        self.limit = limit
+        self.retry_after = retry_after
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __call__(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        if self._semaphore.locked():
+            raise _too_many_requests(self.retry_after, "Server busy, try again later")
+        await self._semaphore.acquire()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+image_concurrency = ConcurrencyLimit(IMAGE_MAX_CONCURRENCY)
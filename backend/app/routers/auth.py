@@ -4,12 +4,14 @@ from typing import Dict
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 import uuid
 
 from .. import database
-from ..auth import authenticate_user, create_access_token, get_current_user, get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..auth import create_access_token, get_current_user, get_password_hash, verify_password, ACCESS_TOKEN_EXPIRE_MINUTES
 from ..models import Token, User, UserCreate, UserLogin
+from ..ratelimit import rate_limit
 
 logger = logging.getLogger("wardrobe-api")
 
@@ -19,7 +21,10 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-@router.post("/register", response_model=User)
+# bcrypt makes each of these calls expensive
+AUTH_RATE_LIMIT_COST = 5
+
+@router.post("/register", response_model=User, dependencies=[Depends(rate_limit(cost=AUTH_RATE_LIMIT_COST, scope="auth"))])
 async def register(user_data: UserCreate):
     try:
         logger.info(f"Registration attempt for email: {user_data.email}")
@@ -35,7 +40,7 @@ async def register(user_data: UserCreate):
         
         # Create new user
         user_id = str(uuid.uuid4())
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
         
         user_dict = {
             "email": user_data.email,
@@ -67,11 +72,13 @@ async def register(user_data: UserCreate):
             detail=f"Registration failed: {str(e)}"
         )
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(rate_limit(cost=AUTH_RATE_LIMIT_COST, scope="auth"))])
 async def login(form_data: UserLogin):
     logger.info(f"Login attempt for email: {form_data.email}")
-    user = authenticate_user(form_data.email, form_data.password)
-    if not user:
+    # Look the user up on the event loop with the other store access; only
+    # the bcrypt check goes to the threadpool
+    user = database.get_user_by_email(form_data.email)
+    if not user or not await run_in_threadpool(verify_password, form_data.password, user["password"]):
         logger.warning(f"Login failed: Incorrect email or password for {form_data.email}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,13 +1,13 @@
 
 import uuid
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from .. import database
 from ..auth import get_current_user
-from ..models import ClothingItem, ClothingItemCreate, ClothingItemUpdate
+from ..models import ClothingItem, ClothingItemCreate, ClothingItemUpdate, WearEvent, WearEventCreate
 
 router = APIRouter(
     prefix="/items",
@@ -57,3 +57,15 @@ async def delete_item(item_id: str, current_user: Dict = Depends(get_current_use
     if not success:
         raise HTTPException(status_code=404, detail="Item not found")
     return None
+
+@router.post("/{item_id}/wear", response_model=WearEvent)
+async def wear_item(
+    item_id: str,
+    wear: Optional[WearEventCreate] = None,
+    current_user: Dict = Depends(get_current_user)
+):
+    if database.get_item_by_id(current_user["id"], item_id) is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    
+    worn_at = (wear.wornAt if wear else None) or datetime.now()
+    return database.record_wear(current_user["id"], worn_at, [item_id])
@@ -1,13 +1,13 @@
 
 import uuid
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from .. import database
 from ..auth import get_current_user
-from ..models import Outfit, OutfitCreate, OutfitUpdate
+from ..models import Outfit, OutfitCreate, OutfitUpdate, WearEvent, WearEventCreate
 
 router = APIRouter(
     prefix="/outfits",
@@ -74,3 +74,22 @@ async def delete_outfit(outfit_id: str, current_user: Dict = Depends(get_current
     if not success:
         raise HTTPException(status_code=404, detail="Outfit not found")
     return None
+
+@router.post("/{outfit_id}/wear", response_model=WearEvent)
+async def wear_outfit(
+    outfit_id: str,
+    wear: Optional[WearEventCreate] = None,
+    current_user: Dict = Depends(get_current_user)
+):
+    outfit = database.get_outfit_by_id(current_user["id"], outfit_id)
+    if outfit is None:
+        raise HTTPException(status_code=404, detail="Outfit not found")
+    
+    # Wearing an outfit counts as wearing each of its items
+    worn_at = (wear.wornAt if wear else None) or datetime.now()
+    return database.record_wear(
+        current_user["id"],
+        worn_at,
+        outfit.get("items", []),
+        outfit_id=outfit_id
+    )
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from typing import Dict
+
+from fastapi import APIRouter, Depends, Query
+
+from .. import database
+from ..auth import get_current_user
+from ..models import ClosetStats
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["statistics"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("/", response_model=ClosetStats)
+async def read_stats(
+    unworn_days: int = Query(90, ge=1),
+    limit: int = Query(5, ge=1, le=100),
+    current_user: Dict = Depends(get_current_user)
+):
+    """
+    Closet analytics served from the pre-aggregated wear counters.
+    Cost depends on the closet size, never on the length of the wear history.
+    """
+    stats = database.get_stats_by_user(current_user["id"])
+    
+    counts = []
+    for item in database.iter_items_by_user(current_user["id"]):
+        counter = stats["items"].get(item["id"], {})
+        # lastWorn set through PATCH is not counted as a wear, but still
+        # means the item has been worn
+        last_worn = max(
+            (database.normalize_timestamp(value)
+             for value in (counter.get("lastWorn"), item.get("lastWorn")) if value),
+            default=None,
+        )
+        counts.append({
+            "id": item["id"],
+            "count": counter.get("count", 0),
+            "lastWorn": last_worn,
+        })
+    
+    cutoff = datetime.now() - timedelta(days=unworn_days)
+    unworn = [c["id"] for c in counts if c["lastWorn"] is None or c["lastWorn"] < cutoff]
+    
+    most_worn = sorted(counts, key=lambda c: c["count"], reverse=True)[:limit]
+    least_worn = sorted(counts, key=lambda c: c["count"])[:limit]
+    
+    return {
+        "totalWears": stats["totalWears"],
+        "mostWorn": most_worn,
+        "leastWorn": least_worn,
+        "unworn": unworn,
+        "categories": stats["categories"],
+        "seasons": stats["seasons"],
+        "byMonth": stats["byMonth"],
+        "byWeekday": stats["byWeekday"],
+    }
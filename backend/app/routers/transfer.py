@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import uuid
+from datetime import datetime
+from typing import IO, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import iterate_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from .. import database
+from ..auth import get_current_user
+from ..models import ClothingItem, ImportSummary, Outfit
+
+logger = logging.getLogger("wardrobe-api")
+
+router = APIRouter(
+    tags=["export/import"],
+    responses={404: {"description": "Not found"}},
+)
+
+EXPORT_FORMAT_VERSION = 1
+IMPORT_BATCH_SIZE = 200
+# Items can carry base64 images inline, so allow generous lines
+MAX_LINE_BYTES = 16 * 1024 * 1024
+MAX_REPORTED_ERRORS = 100
+SPOOL_MAX_MEMORY_BYTES = 1024 * 1024
+
+
+def _ndjson_line(record_type: str, data: Dict) -> bytes:
+    return (json.dumps({"type": record_type, "data": data}, default=str) + "\n").encode("utf-8")
+
+
+async def _export_records(user_id: str) -> AsyncIterator[bytes]:
+    # Items come before outfits so an importer can remap ids in one pass.
+    # An async generator keeps the store reads on the event loop with the
+    # writes; a sync one would run in the threadpool.
+    yield _ndjson_line("header", {"version": EXPORT_FORMAT_VERSION, "exportedAt": datetime.now()})
+    for item in database.iter_items_by_user(user_id):
+        yield _ndjson_line("item", item)
+    for outfit in database.iter_outfits_by_user(user_id):
+        yield _ndjson_line("outfit", outfit)
+
+
+@router.get("/export")
+async def export_closet(current_user: Dict = Depends(get_current_user)):
+    """
+    Stream the user's items and outfits as NDJSON, one record per line.
+    Images travel inline in each item's imageUrl.
+    """
+    filename = f"closet-{datetime.now():%Y%m%d}.ndjson"
+    return StreamingResponse(
+        _export_records(current_user["id"]),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+class _IdMap:
+    """Old-to-new item ids, kept in a temporary SQLite file rather than in memory."""
+
+    def __init__(self):
+        self._dir = tempfile.TemporaryDirectory(prefix="closet-import-")
+        self._conn = sqlite3.connect(os.path.join(self._dir.name, "ids.db"), check_same_thread=False)
+        self._conn.execute("CREATE TABLE ids (old TEXT PRIMARY KEY, new TEXT NOT NULL)")
+
+    def __setitem__(self, old_id: str, new_id: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO ids (old, new) VALUES (?, ?)", (old_id, new_id))
+
+    def get(self, old_id: str) -> Optional[str]:
+        row = self._conn.execute("SELECT new FROM ids WHERE old = ?", (old_id,)).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        self._conn.close()
+        self._dir.cleanup()
+
+
+async def _spool_body(request: Request) -> IO[bytes]:
+    # Buffer the upload on disk so it can be parsed while the response streams
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY_BYTES)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def _read_lines(spool: IO[bytes], line_number: int = 0) -> Iterator[Tuple[int, Optional[bytes]]]:
+    """Yield (line number, line). Lines over MAX_LINE_BYTES are skipped and yielded as None."""
+    while True:
+        line = spool.readline(MAX_LINE_BYTES + 1)
+        if not line:
+            return
+        line_number += 1
+        if len(line) > MAX_LINE_BYTES and not line.endswith(b"\n"):
+            # Discard the rest of the oversized line
+            while line and not line.endswith(b"\n"):
+                line = spool.readline(MAX_LINE_BYTES + 1)
+            yield line_number, None
+            continue
+        yield line_number, line
+
+
+def _parse_record(raw_line: bytes) -> Tuple[str, Dict]:
+    record = json.loads(raw_line)
+    return record["type"], dict(record["data"])
+
+
+def _read_header(spool: IO[bytes]) -> int:
+    """
+    Check the header if the file starts with one. Returns the number of
+    lines consumed; when the first record is not a header nothing is consumed.
+    """
+    for line_number, raw_line in _read_lines(spool):
+        if raw_line is not None and not raw_line.strip():
+            continue
+        try:
+            record_type, data = _parse_record(raw_line)
+        except (ValueError, KeyError, TypeError):
+            record_type = None
+        if record_type != "header":
+            spool.seek(0)
+            return 0
+        if data.get("version") != EXPORT_FORMAT_VERSION:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported export version: {data.get('version')}",
+            )
+        return line_number
+    return 0
+
+
+def _record_error(summary: Dict, line_number: int, detail: str) -> None:
+    summary["errorCount"] += 1
+    if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+        summary["errors"].append({"line": line_number, "detail": detail})
+
+
+def _parse_batches(
+    spool: IO[bytes], first_line: int, id_map: _IdMap, summary: Dict
+) -> Iterator[Tuple[Dict[str, Dict], Dict[str, Dict]]]:
+    """Parse and validate records, yielding (items, outfits) batches ready to write."""
+    pending_items: Dict[str, Dict] = {}
+    pending_outfits: Dict[str, Dict] = {}
+
+    for line_number, raw_line in _read_lines(spool, first_line):
+        if raw_line is None:
+            summary["linesRead"] += 1
+            _record_error(summary, line_number, f"Line exceeds {MAX_LINE_BYTES} bytes")
+            continue
+        if not raw_line.strip():
+            continue
+        summary["linesRead"] += 1
+
+        try:
+            record_type, data = _parse_record(raw_line)
+        except (ValueError, KeyError, TypeError):
+            _record_error(summary, line_number, "Malformed record")
+            continue
+
+        if record_type == "header":
+            _record_error(summary, line_number, "Header is only allowed as the first line")
+            continue
+
+        old_id = data.get("id")
+        new_id = str(uuid.uuid4())
+        data["id"] = new_id
+        data.setdefault("createdAt", datetime.now())
+
+        if record_type == "item":
+            try:
+                item = ClothingItem.parse_obj(data).dict(exclude={"id"})
+            except ValidationError as e:
+                _record_error(summary, line_number, str(e))
+                continue
+            if isinstance(old_id, str):
+                id_map[old_id] = new_id
+            pending_items[new_id] = item
+        elif record_type == "outfit":
+            item_ids = data.get("items", [])
+            if not isinstance(item_ids, list) or not all(isinstance(i, str) for i in item_ids):
+                _record_error(summary, line_number, "Outfit items must be a list of item ids")
+                continue
+            new_item_ids = [id_map.get(i) for i in item_ids]
+            missing = [old for old, new in zip(item_ids, new_item_ids) if new is None]
+            if missing:
+                _record_error(summary, line_number, f"Outfit references unknown items: {', '.join(missing)}")
+                continue
+            data["items"] = new_item_ids
+            try:
+                outfit = Outfit.parse_obj(data).dict(exclude={"id"})
+            except ValidationError as e:
+                _record_error(summary, line_number, str(e))
+                continue
+            pending_outfits[new_id] = outfit
+        else:
+            _record_error(summary, line_number, f"Unknown record type: {record_type}")
+            continue
+
+        if len(pending_items) + len(pending_outfits) >= IMPORT_BATCH_SIZE:
+            yield pending_items, pending_outfits
+            pending_items, pending_outfits = {}, {}
+
+    if pending_items or pending_outfits:
+        yield pending_items, pending_outfits
+
+
+async def _import_records(user_id: str, spool: IO[bytes], first_line: int) -> AsyncIterator[bytes]:
+    id_map = _IdMap()
+    summary = {
+        # The header, when there is one, was already read by _read_header
+        "linesRead": 1 if first_line else 0,
+        "itemsImported": 0,
+        "outfitsImported": 0,
+        "batches": 0,
+        "errors": [],
+        "errorCount": 0,
+    }
+
+    try:
+        # Parsing runs in the threadpool, but the writes stay on the event
+        # loop: the JSON store is only safe when accessed from one thread.
+        batches = iterate_in_threadpool(_parse_batches(spool, first_line, id_map, summary))
+        async for items, outfits in batches:
+            if items:
+                database.create_items(user_id, items)
+                summary["itemsImported"] += len(items)
+            if outfits:
+                database.create_outfits(user_id, outfits)
+                summary["outfitsImported"] += len(outfits)
+            summary["batches"] += 1
+            logger.info(
+                f"Import for user {user_id}: {summary['linesRead']} lines read, "
+                f"{summary['itemsImported']} items, {summary['outfitsImported']} outfits"
+            )
+            progress = {key: summary[key] for key in ["linesRead", "itemsImported", "outfitsImported", "batches", "errorCount"]}
+            yield _ndjson_line("progress", progress)
+
+        yield _ndjson_line("summary", ImportSummary(**summary).dict())
+    finally:
+        id_map.close()
+        spool.close()
+
+
+@router.post("/import")
+async def import_closet(request: Request, current_user: Dict = Depends(get_current_user)):
+    """
+    Import an NDJSON export. Every record gets a fresh id and outfits are
+    pointed at the new item ids; invalid lines are skipped and reported.
+    The response is NDJSON too: a progress record after each batch is
+    written, then a final summary.
+    """
+    spool = await _spool_body(request)
+    try:
+        first_line = _read_header(spool)
+    except HTTPException:
+        spool.close()
+        raise
+    return StreamingResponse(
+        _import_records(current_user["id"], spool, first_line),
+        media_type="application/x-ndjson",
+    )
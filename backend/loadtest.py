@@ -0,0 +1,166 @@
+"""
+Load test for admission control on the image pipeline.
+
+Measures GET /items latency on its own, then again while many clients flood
+/images/remove-background/. The background removals should be held to
+IMAGE_MAX_CONCURRENCY (the rest get 429) while GET /items stays fast.
+
+By default this starts its own server with a rate limit capacity high enough
+that only the concurrency cap kicks in, and a throwaway data directory:
+    python loadtest.py
+
+To test a server that is already running instead:
+    python loadtest.py --url http://localhost:8000
+"""
+import argparse
+import asyncio
+import io
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+
+import httpx
+from PIL import Image
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _test_image() -> bytes:
+    buf = io.BytesIO()
+    image = Image.new("RGB", (1600, 1600), "white")
+    image.paste((30, 30, 120), (400, 400, 1200, 1200))
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int, max_concurrency: int) -> subprocess.Popen:
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    env = {
+        **os.environ,
+        "RATE_LIMIT_CAPACITY": "1000000",
+        "IMAGE_MAX_CONCURRENCY": str(max_concurrency),
+        "PYTHONPATH": os.pathsep.join(filter(None, [backend_dir, os.environ.get("PYTHONPATH")])),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=tempfile.mkdtemp(prefix="wardrobe-loadtest-"),
+        env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/")
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Server did not start")
+
+
+async def _login(client: httpx.AsyncClient) -> str:
+    credentials = {"email": f"loadtest-{uuid.uuid4()}@example.com", "password": "loadtest"}
+    response = await client.post("/auth/register", json={**credentials, "name": "Load Test"})
+    response.raise_for_status()
+    response = await client.post("/auth/login", json=credentials)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def _measure_items(client, headers, requests):
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get("/items/", headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return latencies
+
+
+async def _flood_images(client, headers, image, workers, stop):
+    statuses = Counter()
+    processed = []
+
+    async def worker():
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = await client.post(
+                "/images/remove-background/",
+                headers=headers,
+                files={"file": ("test.png", image, "image/png")},
+            )
+            statuses[response.status_code] += 1
+            if response.status_code == 200:
+                processed.append((time.perf_counter() - start) * 1000)
+            elif response.status_code == 429:
+                # Back off like a well-behaved client
+                await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return statuses, processed
+
+
+def _report(label, latencies):
+    print(
+        f"{label}: p50={statistics.median(latencies):.1f}ms "
+        f"p95={_percentile(latencies, 95):.1f}ms max={max(latencies):.1f}ms"
+    )
+
+
+async def main(url, workers, requests):
+    limits = httpx.Limits(max_connections=workers + 10)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        headers = {"Authorization": f"Bearer {await _login(client)}"}
+        image = _test_image()
+
+        _report("GET /items idle     ", await _measure_items(client, headers, requests))
+
+        stop = asyncio.Event()
+        flood = asyncio.create_task(_flood_images(client, headers, image, workers, stop))
+        await asyncio.sleep(1)
+        saturated = await _measure_items(client, headers, requests)
+        stop.set()
+        statuses, processed = await flood
+
+        _report("GET /items saturated", saturated)
+        print(f"remove-background responses: {dict(statuses)}")
+        if processed:
+            _report("remove-background OK", processed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="test a running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=20, help="concurrent image requests")
+    parser.add_argument("--requests", type=int, default=200, help="GET /items samples per phase")
+    parser.add_argument(
+        "--max-concurrency", type=int, default=2,
+        help="IMAGE_MAX_CONCURRENCY for the started server; set it high for an uncapped baseline",
+    )
+    args = parser.parse_args()
+    server = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        server = _start_server(port, args.max_concurrency)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(main(url, args.workers, args.requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
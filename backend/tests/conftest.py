@@ -0,0 +1,48 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import database, ratelimit
+from app.auth import create_access_token
+from app.main import app
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    # Point the file-based store at a fresh directory for every test
+    for name in ["USER_FILE", "ITEMS_FILE", "OUTFITS_FILE", "STATS_FILE"]:
+        path = tmp_path / os.path.basename(getattr(database, name))
+        path.write_text("{}")
+        monkeypatch.setattr(database, name, str(path))
+    monkeypatch.setattr(database, "WEAR_EVENTS_FILE", str(tmp_path / "wear_events.jsonl"))
+    monkeypatch.setattr(ratelimit, "backend", ratelimit.MemoryBackend())
+    return tmp_path
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+def make_user(user_id: str = "test-user") -> dict:
+    database.create_user(user_id, {
+        "email": f"{user_id}@example.com",
+        "name": "Test User",
+        "password": "not-a-real-hash",
+        "createdAt": "2026-01-01 00:00:00",
+    })
+    return {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+@pytest.fixture
+def auth_headers():
+    return make_user()
+
+def item_payload(**overrides) -> dict:
+    payload = {
+        "name": "Shirt",
+        "imageUrl": "shirt.png",
+        "category": "tops",
+        "color": "blue",
+        "season": ["summer"],
+        "occasion": ["casual"],
+    }
+    payload.update(overrides)
+    return payload
@@ -0,0 +1,129 @@
+import asyncio
+import io
+import sqlite3
+import time
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from app import ratelimit
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return ratelimit.SqliteBackend(str(tmp_path / "ratelimit.db"))
+    return ratelimit.MemoryBackend()
+
+def png_bytes() -> bytes:
+    buf = io.BytesIO()
+    image = Image.new("RGB", (64, 64), "white")
+    image.paste((0, 0, 0), (16, 16, 48, 48))
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+def login(client):
+    return client.post("/auth/login", json={"email": "nobody@example.com", "password": "x"})
+
+def test_backend_rejects_when_empty(backend):
+    assert backend.take(["a"], 5, 10, 1) == 0
+    assert backend.take(["a"], 5, 10, 1) == 0
+    assert backend.take(["a"], 5, 10, 1) == pytest.approx(5, abs=0.1)
+
+def test_backend_does_not_charge_when_any_bucket_rejects(backend):
+    assert backend.take(["user"], 10, 10, 1) == 0
+    assert backend.take(["ip", "user"], 5, 10, 1) > 0
+    # The rejected request left the IP bucket full
+    assert backend.take(["ip"], 10, 10, 1) == 0
+
+def test_backend_sweeps_full_buckets(backend, monkeypatch):
+    monkeypatch.setattr(ratelimit, "SWEEP_INTERVAL_SECONDS", 3600)
+    backend.take(["a"], 1, 10, 1000)
+    backend.take(["b"], 1, 10, 1000)
+    assert len(backend) == 2
+    # Both refill within a millisecond, so the next call sweeps them out
+    time.sleep(0.01)
+    monkeypatch.setattr(ratelimit, "SWEEP_INTERVAL_SECONDS", 0)
+    backend.take(["c"], 0, 10, 1000)
+    assert len(backend) <= 1
+
+def test_login_returns_429_with_retry_after(client, monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_CAPACITY", 10)
+    assert login(client).status_code == 401
+    assert login(client).status_code == 401
+
+    response = login(client)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+def test_scopes_use_separate_buckets(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_CAPACITY", 10)
+    image = png_bytes()
+
+    def remove_background():
+        return client.post(
+            "/images/remove-background/",
+            files={"file": ("item.png", image, "image/png")},
+            headers=auth_headers,
+        )
+
+    assert remove_background().status_code == 200
+    assert remove_background().status_code == 429
+    # Exhausting the image bucket leaves login alone
+    assert login(client).status_code == 401
+
+def test_busy_rejection_costs_no_tokens(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_CAPACITY", 10)
+    image = png_bytes()
+
+    def remove_background():
+        return client.post(
+            "/images/remove-background/",
+            files={"file": ("item.png", image, "image/png")},
+            headers=auth_headers,
+        )
+
+    # A semaphore with no free slots stands in for a full pipeline
+    monkeypatch.setattr(ratelimit.image_concurrency, "_semaphore", asyncio.Semaphore(0))
+    response = remove_background()
+    assert response.status_code == 429
+    assert response.json()["detail"] == "Server busy, try again later"
+
+    monkeypatch.setattr(ratelimit.image_concurrency, "_semaphore", None)
+    # The bucket only holds one request's worth, so this fails if the busy
+    # rejection was charged
+    assert remove_background().status_code == 200
+
+def test_cost_above_capacity_is_rejected(monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_CAPACITY", 8)
+    with pytest.raises(ValueError):
+        ratelimit.rate_limit(cost=10, scope="images")
+
+def test_non_positive_refill_rate_is_rejected(monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_REFILL_PER_SECOND", 0)
+    with pytest.raises(ValueError):
+        ratelimit._validate_settings()
+
+def test_locked_database_fails_open(client, monkeypatch):
+    class LockedBackend:
+        def take(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(ratelimit, "backend", LockedBackend())
+    assert login(client).status_code == 401
+
+def test_concurrency_limit_rejects_over_cap():
+    limit = ratelimit.ConcurrencyLimit(1)
+
+    async def scenario():
+        holder = limit()
+        await holder.__anext__()
+        with pytest.raises(HTTPException) as excinfo:
+            await limit().__anext__()
+        assert excinfo.value.status_code == 429
+        await holder.aclose()
+        second = limit()
+        await second.__anext__()
+        await second.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+from app import database
+from .conftest import item_payload
+
+def create_item(client, headers, **overrides):
+    return client.post("/items/", json=item_payload(**overrides), headers=headers).json()["id"]
+
+def test_item_wear_updates_counters_and_rollups(client, auth_headers):
+    item_id = create_item(client, auth_headers, season=["summer", "fall"])
+
+    response = client.post(f"/items/{item_id}/wear", json={"wornAt": "2026-03-02T09:00:00"}, headers=auth_headers)
+    assert response.status_code == 200
+    client.post(f"/items/{item_id}/wear", json={"wornAt": "2026-03-09T09:00:00"}, headers=auth_headers)
+
+    stats = client.get("/stats/", headers=auth_headers).json()
+    assert stats["totalWears"] == 2
+    assert stats["mostWorn"][0] == {"id": item_id, "count": 2, "lastWorn": "2026-03-09T09:00:00"}
+    assert stats["categories"] == {"tops": 2}
+    assert stats["seasons"] == {"summer": 2, "fall": 2}
+    assert stats["byMonth"] == {"2026-03": 2}
+    assert stats["byWeekday"] == {"0": 2}
+    assert client.get(f"/items/{item_id}", headers=auth_headers).json()["lastWorn"] == "2026-03-09T09:00:00"
+
+def test_outfit_wear_fans_out_once_per_item(client, auth_headers):
+    top = create_item(client, auth_headers)
+    shoes = create_item(client, auth_headers, category="shoes")
+    outfit_id = client.post("/outfits/", json={
+        "name": "Weekend",
+        "items": [top, shoes, top],
+        "occasion": ["casual"],
+        "season": ["summer"],
+    }, headers=auth_headers).json()["id"]
+
+    event = client.post(f"/outfits/{outfit_id}/wear", headers=auth_headers).json()
+    assert event["items"] == [top, shoes]
+
+    stats = database.get_stats_by_user("test-user")
+    assert stats["items"][top]["count"] == 1
+    assert stats["outfits"][outfit_id]["count"] == 1
+    assert stats["categories"] == {"tops": 1, "shoes": 1}
+    assert stats["totalWears"] == 2
+
+def test_aware_and_naive_wears_are_ordered_together(client, auth_headers):
+    item_id = create_item(client, auth_headers)
+    client.post(f"/items/{item_id}/wear", json={"wornAt": "2025-10-19T23:00:00Z"}, headers=auth_headers)
+    client.post(f"/items/{item_id}/wear", json={"wornAt": "2025-12-01T00:00:00"}, headers=auth_headers)
+
+    item = client.get(f"/items/{item_id}", headers=auth_headers).json()
+    assert item["lastWorn"] == "2025-12-01T00:00:00"
+    counter = database.get_stats_by_user("test-user")["items"][item_id]
+    assert counter["lastWorn"] == "2025-12-01 00:00:00"
+    assert counter["firstWorn"] == str(database.normalize_timestamp("2025-10-19T23:00:00+00:00"))
+
+def test_future_wear_is_rejected(client, auth_headers):
+    item_id = create_item(client, auth_headers)
+    future = (datetime.now() + timedelta(days=1)).isoformat()
+
+    response = client.post(f"/items/{item_id}/wear", json={"wornAt": future}, headers=auth_headers)
+    assert response.status_code == 422
+    assert database.get_stats_by_user("test-user")["totalWears"] == 0
+
+def test_patched_last_worn_is_not_reported_unworn(client, auth_headers):
+    item_id = create_item(client, auth_headers)
+    never_worn = create_item(client, auth_headers)
+    client.patch(f"/items/{item_id}", json={"lastWorn": str(datetime.now())}, headers=auth_headers)
+
+    stats = client.get("/stats/", headers=auth_headers).json()
+    assert stats["unworn"] == [never_worn]
+    assert stats["totalWears"] == 0
+
+def test_unworn_uses_cutoff(client, auth_headers):
+    old = create_item(client, auth_headers)
+    recent = create_item(client, auth_headers)
+    client.post(f"/items/{old}/wear", json={"wornAt": "2020-01-01T00:00:00"}, headers=auth_headers)
+    client.post(f"/items/{recent}/wear", headers=auth_headers)
+
+    assert client.get("/stats/?unworn_days=90", headers=auth_headers).json()["unworn"] == [old]
+
+def test_deleting_item_drops_counter_but_keeps_rollups(client, auth_headers):
+    item_id = create_item(client, auth_headers)
+    client.post(f"/items/{item_id}/wear", headers=auth_headers)
+    client.delete(f"/items/{item_id}", headers=auth_headers)
+
+    stats = database.get_stats_by_user("test-user")
+    assert item_id not in stats["items"]
+    assert stats["categories"] == {"tops": 1}
+    assert client.get("/stats/", headers=auth_headers).json()["mostWorn"] == []
+
+def test_wear_unknown_item_returns_404(client, auth_headers):
+    assert client.post("/items/missing/wear", headers=auth_headers).status_code == 404
+    assert client.post("/outfits/missing/wear", headers=auth_headers).status_code == 404
@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import httpx
+
+from app import database
+from app.main import app
+from app.routers import transfer
+from .conftest import item_payload, make_user
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+def ndjson(*records) -> bytes:
+    return "".join(
+        (record if isinstance(record, str) else json.dumps(record)) + "\n" for record in records
+    ).encode()
+
+def item_record(item_id, **overrides):
+    return {"type": "item", "data": {"id": item_id, **item_payload(**overrides)}}
+
+def outfit_record(outfit_id, item_ids):
+    return {"type": "outfit", "data": {
+        "id": outfit_id, "name": "Look", "items": item_ids, "occasion": [], "season": [],
+    }}
+
+def import_closet(client, headers, body):
+    return client.post("/import", content=body, headers=headers)
+
+def test_export_round_trip_remaps_ids(client, auth_headers):
+    top = client.post("/items/", json=item_payload(), headers=auth_headers).json()["id"]
+    client.post("/outfits/", json={"name": "Look", "items": [top], "occasion": [], "season": []}, headers=auth_headers)
+
+    exported = client.get("/export", headers=auth_headers)
+    assert exported.headers["content-type"] == "application/x-ndjson"
+    assert [r["type"] for r in read_ndjson(exported)] == ["header", "item", "outfit"]
+
+    response = import_closet(client, auth_headers, exported.content)
+    assert response.status_code == 200
+    summary = read_ndjson(response)[-1]
+    assert summary["type"] == "summary"
+    assert summary["data"]["itemsImported"] == 1
+    assert summary["data"]["outfitsImported"] == 1
+
+    items = database.get_items_by_user("test-user")
+    new_top = next(item["id"] for item in items if item["id"] != top)
+    outfit_items = [outfit["items"] for outfit in database.get_outfits_by_user("test-user")]
+    assert sorted(outfit_items) == sorted([[top], [new_top]])
+
+def test_bad_lines_are_reported_and_skipped(client, auth_headers):
+    body = ndjson(
+        {"type": "header", "data": {"version": 1}},
+        item_record("a"),
+        "not json",
+        item_record("b", category=None),
+        outfit_record("o", ["a", "missing"]),
+        {"type": "sock", "data": {}},
+        "",
+        {"type": "header", "data": {"version": 1}},
+    )
+    summary = read_ndjson(import_closet(client, auth_headers, body))[-1]["data"]
+
+    assert summary["itemsImported"] == 1
+    assert summary["outfitsImported"] == 0
+    assert summary["linesRead"] == 7
+    assert [error["line"] for error in summary["errors"]] == [3, 4, 5, 6, 8]
+    assert summary["errorCount"] == 5
+
+def test_progress_is_streamed_per_batch(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(transfer, "IMPORT_BATCH_SIZE", 2)
+    body = ndjson(*(item_record(str(i)) for i in range(5)))
+
+    records = read_ndjson(import_closet(client, auth_headers, body))
+    progress = [r["data"] for r in records if r["type"] == "progress"]
+    assert [p["itemsImported"] for p in progress] == [2, 4, 5]
+    assert records[-1]["data"]["batches"] == 3
+    assert len(database.get_items_by_user("test-user")) == 5
+
+def test_outfit_can_reference_item_from_earlier_batch(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(transfer, "IMPORT_BATCH_SIZE", 1)
+    body = ndjson(item_record("a"), item_record("b"), outfit_record("o", ["a", "b"]))
+
+    summary = read_ndjson(import_closet(client, auth_headers, body))[-1]["data"]
+    assert summary["outfitsImported"] == 1
+    outfit = database.get_outfits_by_user("test-user")[0]
+    assert sorted(outfit["items"]) == sorted(item["id"] for item in database.get_items_by_user("test-user"))
+
+def test_unsupported_version_rejected_before_writing(client, auth_headers):
+    body = ndjson({"type": "header", "data": {"version": 2}}, item_record("a"))
+
+    response = import_closet(client, auth_headers, body)
+    assert response.status_code == 400
+    assert database.get_items_by_user("test-user") == []
+
+def test_oversized_line_is_skipped(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(transfer, "MAX_LINE_BYTES", 300)
+    body = ndjson(item_record("big", description="x" * 1000), item_record("small"))
+
+    summary = read_ndjson(import_closet(client, auth_headers, body))[-1]["data"]
+    assert summary["itemsImported"] == 1
+    assert summary["errors"] == [{"line": 1, "detail": "Line exceeds 300 bytes"}]
+
+def test_import_alongside_item_creation_keeps_all_items(auth_headers, monkeypatch):
+    monkeypatch.setattr(transfer, "IMPORT_BATCH_SIZE", 10)
+    database.create_items("other-user", {f"o{i}": item_payload() for i in range(2000)})
+    other_headers = make_user("other-user")
+    body = ndjson(*(item_record(str(i)) for i in range(300)))
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            async def create(delay):
+                # Spread the creates across the import's batch writes
+                await asyncio.sleep(delay)
+                return await client.post("/items/", json=item_payload(), headers=other_headers)
+
+            creates = [create(i * 0.01) for i in range(40)]
+            responses = await asyncio.gather(
+                client.post("/import", content=body, headers=auth_headers), *creates
+            )
+        return responses
+
+    responses = asyncio.run(scenario())
+    assert all(response.status_code == 200 for response in responses)
+    assert len(database.get_items_by_user("test-user")) == 300
+    assert len(database.get_items_by_user("other-user")) == 2040